@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2018 HeiGIT, University of Heidelberg.
+#
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy of
+# the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations under
+# the License.
+#
+
+"""Caches API responses of repeated requests, e.g. geocoding the same addresses."""
+
+from collections import OrderedDict
+import copy
+import functools
+import hashlib
+import threading
+import time
+
+try:  # Python 3.6+
+    _digest = functools.partial(hashlib.blake2b, digest_size=16)
+except AttributeError:  # Python 2
+    _digest = hashlib.md5
+
+DEFAULT_EXPIRE = 604800  # one week in seconds
+
+
+class ResponseCache(object):
+    """In-memory LRU cache for API responses, optionally backed by a
+    persistent on-disk tier.
+
+    Pass an instance as ``cache`` argument to the geocoding methods. Any other
+    object implementing ``get(key)`` and ``set(key, value)`` can be used
+    as well. Instances are safe to share between threads.
+    """
+
+    def __init__(self, maxsize=1024, expire=DEFAULT_EXPIRE, directory=None):
+        """
+        :param maxsize: Maximum number of responses held in memory.
+        :type maxsize: int
+
+        :param expire: Seconds after which a cached response is discarded.
+            Specify "None" to never expire. Default one week.
+        :type expire: int
+
+        :param directory: Directory of the persistent cache tier. Requires the
+            ``diskcache`` package. Default None, i.e. memory only.
+        :type directory: string
+        """
+
+        self._maxsize = maxsize
+        self._expire = expire
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk = None
+
+        if directory is not None:
+            try:
+                import diskcache
+            except ImportError:
+                raise ImportError("A persistent cache requires diskcache: pip install diskcache")
+            self._disk = diskcache.Cache(directory)
+
+    def get(self, key):
+        """Returns the cached response for key or None."""
+
+        with self._lock:
+            try:
+                value, expires_at = self._memory.pop(key)
+            except KeyError:
+                pass
+            else:
+                if expires_at is None or expires_at > time.time():
+                    # Re-insert to mark as most recently used
+                    self._memory[key] = (value, expires_at)
+                    return value
+
+        if self._disk is not None:
+            value, expires_at = self._disk.get(key, expire_time=True)
+            if value is not None:
+                self._remember(key, value, expires_at)
+                return value
+
+        return None
+
+    def set(self, key, value):
+        """Stores the response value under key in all tiers."""
+
+        expires_at = None if self._expire is None else time.time() + self._expire
+        self._remember(key, value, expires_at)
+
+        if self._disk is not None:
+            self._disk.set(key, value, expire=self._expire)
+
+    def _remember(self, key, value, expires_at):
+        with self._lock:
+            self._memory.pop(key, None)
+            self._memory[key] = (value, expires_at)
+
+            while len(self._memory) > self._maxsize:
+                self._memory.popitem(last=False)
+
+
+def _cache_key(url, params):
+    """Hashes the request URL and its parameters to a cache key.
+
+    :param url: The full URL of the endpoint.
+    :type url: string
+
+    :param params: HTTP GET parameters.
+    :type params: dict
+
+    :rtype: string
+    """
+    key = repr((url, tuple(sorted(params.items()))))
+    return _digest(key.encode('utf-8')).hexdigest()
+
+
+def _cache_get(cache, url, params):
+    """Returns a copy of the cached response of a request or None, so callers
+    can't modify the cached response."""
+    return copy.deepcopy(cache.get(_cache_key(url, params)))
+
+
+def _cache_set(cache, url, params, value):
+    """Stores a copy of the response of a request."""
+    cache.set(_cache_key(url, params), copy.deepcopy(value))
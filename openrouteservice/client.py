@@ -32,6 +32,11 @@ import warnings
 
 from openrouteservice import exceptions, __version__, get_ordinal
 
+try:  # Optional, parses large responses (e.g. geocoding) several times faster
+    import orjson
+except ImportError:
+    orjson = None
+
 try:  # Python 3
     from urllib.parse import urlencode
 except ImportError:  # Python 2
@@ -42,6 +47,11 @@ _DEFAULT_BASE_URL = "https://api.openrouteservice.org"
 
 _RETRIABLE_STATUSES = set([503])
 
+# Connection pool of the client's session. Connections are kept alive and
+# reused across requests, so only the first request pays for the TLS handshake.
+_POOL_CONNECTIONS = 16
+_POOL_MAXSIZE = 64
+
 
 class Client(object):
     """Performs requests to the ORS API services."""
@@ -81,6 +91,9 @@ class Client(object):
         """
 
         self._session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=_POOL_CONNECTIONS, pool_maxsize=_POOL_MAXSIZE)
+        self._session.mount('https://', adapter)
+        self._session.mount('http://', adapter)
         self._key = key
         self._base_url = base_url
 
@@ -222,11 +235,16 @@ class Client(object):
         """Returns request object. Can be used in case of request failure."""
         return self._req
 
+    @property
+    def base_url(self):
+        """Returns the base URL the request paths are appended to."""
+        return self._base_url
+
     @staticmethod
     def _get_body(response):
         """Returns the body of a response object, raises status code exceptions if necessary."""
         try:
-            body = response.json()
+            body = response.json() if orjson is None else orjson.loads(response.content)
         except json.JSONDecodeError:
             raise exceptions.HTTPError(response.status_code)
 
@@ -273,6 +291,7 @@ from openrouteservice.elevation import elevation_point
 from openrouteservice.elevation import elevation_line
 from openrouteservice.isochrones import isochrones
 from openrouteservice.geocode import pelias_search
+from openrouteservice.geocode import pelias_search_bulk
 from openrouteservice.geocode import pelias_autocomplete
 from openrouteservice.geocode import pelias_structured
 from openrouteservice.geocode import pelias_reverse
@@ -310,6 +329,7 @@ Client.elevation_point = _make_api_method(elevation_point)
 Client.elevation_line = _make_api_method(elevation_line)
 Client.isochrones = _make_api_method(isochrones)
 Client.pelias_search = _make_api_method(pelias_search)
+Client.pelias_search_bulk = _make_api_method(pelias_search_bulk)
 Client.pelias_autocomplete = _make_api_method(pelias_autocomplete)
 Client.pelias_structured = _make_api_method(pelias_structured)
 Client.pelias_reverse = _make_api_method(pelias_reverse)
@@ -59,13 +59,14 @@ def _format_float(arg):
     format_float(40.1) -> "40.1"
     format_float(40.001) -> "40.001"
     format_float(40.0010) -> "40.001"
+    format_float(0.00001) -> "0.00001"
 
     :param arg: The lat or lng float.
     :type arg: float
 
     :rtype: string
     """
-    return ("{}".format(round(float(arg), 6)).rstrip("0").rstrip("."))
+    return "{:.6f}".format(float(arg)).rstrip("0").rstrip(".")
 
 
 def _build_coords(arg):
@@ -107,6 +108,8 @@ def _concat_coords(arg):
 
 def _is_list(arg):
     """Checks if arg is list-like."""
+    if isinstance(arg, (list, tuple)):  # fast path for the common case
+        return True
     if isinstance(arg, dict):
         return False
     if isinstance(arg, str):  # Python 3-only, as str has __iter__
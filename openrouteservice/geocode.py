@@ -18,7 +18,72 @@
 #
 
 """Performs requests to the ORS geocode API (direct Pelias clone)."""
+from collections import namedtuple
+from multiprocessing.pool import ThreadPool
+import json
+import os
+
+try:  # Python 3
+    from functools import lru_cache
+except ImportError:  # Python 2, no memoization
+    def lru_cache(maxsize=128):
+        return lambda func: func
+
 from openrouteservice import convert
+from openrouteservice.cache import _cache_get, _cache_set
+
+# Bound once at import, these are called many times per request. Coordinates
+# tend to repeat across batch requests, so their formatting is memoized.
+_format_float = lru_cache(maxsize=4096)(convert._format_float)
+_comma_list = convert._comma_list
+
+_SEARCH_URL = "/geocode/search"
+_AUTOCOMPLETE_URL = "/geocode/autocomplete"
+_STRUCTURED_URL = "/geocode/search/structured"
+_REVERSE_URL = "/geocode/reverse"
+
+try:  # Python 2
+    _string_types = (basestring,)
+except NameError:  # Python 3
+    _string_types = (str,)
+
+# Postal codes are documented as integer, but are strings in many countries
+_postalcode_types = _string_types + (int,)
+
+_structured_type_errors = {name: "{} must be a string.".format(name.capitalize())
+                           for name in ('address', 'neighbourhood', 'borough', 'locality', 'county', 'region',
+                                        'country')}
+_structured_type_errors['postalcode'] = "Postalcode must be a string or integer."
+
+# Arguments of pelias_search which are query parameters, plus validate
+_search_arguments = frozenset(['text', 'focus_point', 'rect_min_x', 'rect_min_y', 'rect_max_x', 'rect_max_y',
+                               'circle_point', 'circle_radius', 'sources', 'layers', 'country', 'size', 'validate'])
+
+# Short aliases and full names of the Pelias sources
+valid_sources = frozenset(['osm', 'oa', 'wof', 'gn', 'openstreetmap', 'openaddresses', 'whosonfirst', 'geonames'])
+
+valid_layers = frozenset(['venue', 'address', 'street', 'neighbourhood', 'borough', 'localadmin', 'locality',
+                          'county', 'macrocounty', 'region', 'macroregion', 'country', 'coarse', 'postalcode'])
+
+
+def _load_country_codes():
+    """Reads the alpha-2 and alpha-3 ISO-3166 country codes shipped with the package."""
+
+    with open(os.path.join(os.path.dirname(__file__), 'iso3166.json')) as f:
+        iso3166 = json.load(f)
+
+    return frozenset(iso3166['alpha_2'] + iso3166['alpha_3'])
+
+
+valid_countries = _load_country_codes()
+
+
+class GeocodeHit(namedtuple('GeocodeHit', ['lon', 'lat', 'label', 'confidence'])):
+    """A single geocoding result, a fraction of the size of its GeoJSON feature.
+
+    lon and lat are None for features without a geometry.
+    """
+    __slots__ = ()
 
 
 def pelias_search(client, text,
@@ -34,7 +99,9 @@ def pelias_search(client, text,
                   country=None,
                   size=None,
                   validate=True,
-                  dry_run=None):
+                  dry_run=None,
+                  cache=None,
+                  hits_only=False):
     """
     Geocoding is the process of converting addresses into geographic
     coordinates.
@@ -83,53 +150,202 @@ def pelias_search(client, text,
     :param size: The amount of results returned. Default 10.
     :type size: integer
     
+    :param validate: Specifies whether sources, layers and country should be
+        validated before sending the request. Default True.
+    :type validate: boolean
+
     :param dry_run: Print URL and parameters without sending the request.
     :param dry_run: boolean
 
+    :param cache: Response cache consulted before sending the request, e.g. a
+        :class:`openrouteservice.cache.ResponseCache`. Default None.
+    :type cache: object with get(key) and set(key, value) methods
+
+    :param hits_only: Return a list of :class:`GeocodeHit` instead of the full
+        GeoJSON response. Default False.
+    :type hits_only: boolean
+
     :raises ValueError: When parameter has invalid value(s).
     :raises TypeError: When parameter is of the wrong type.
 
-    :rtype: call to Client.request()
+    :rtype: dict from JSON response or list of GeocodeHit
     """
 
-    params = {'text': text}
+    params = _build_search_params(text,
+                                  focus_point=focus_point,
+                                  rect_min_x=rect_min_x,
+                                  rect_min_y=rect_min_y,
+                                  rect_max_x=rect_max_x,
+                                  rect_max_y=rect_max_y,
+                                  circle_point=circle_point,
+                                  circle_radius=circle_radius,
+                                  sources=sources,
+                                  layers=layers,
+                                  country=country,
+                                  size=size,
+                                  validate=validate)
+
+    return _request(client, _SEARCH_URL, params, dry_run, cache, hits_only)
+
+
+def pelias_search_bulk(client, queries,
+                       concurrency=8,
+                       dry_run=None,
+                       cache=None,
+                       hits_only=False):
+    """
+    Geocodes many queries against the search endpoint concurrently.
 
-    if focus_point:
-        params['focus.point.lon'] = convert._format_float(focus_point[0])
-        params['focus.point.lat'] = convert._format_float(focus_point[1])
+    The requests share the client's connection pool, so the network latency
+    of up to ``concurrency`` requests overlaps.
 
-    if rect_min_x:
-        params['boundary.rect.min_lon'] = convert._format_float(rect_min_x)  #
+    Install ``orjson`` to speed up parsing the many responses, it is picked up
+    automatically.
 
-    if rect_min_y:
-        params['boundary.rect.min_lat'] = convert._format_float(rect_min_y)  #
+    The requests run in parallel threads, so afterwards ``Client.req`` holds an
+    arbitrary one of them, and ``extra_params`` is not supported (the client
+    is not thread-safe, see GH #160).
 
-    if rect_max_x:
-        params['boundary.rect.max_lon'] = convert._format_float(rect_max_x)  #
+    :param queries: Full-text queries or dicts of :meth:`pelias_search` query
+        parameters and validate, e.g. {'text': 'Heidelberg', 'size': 1}.
+        dry_run, cache and hits_only apply to all queries and are passed
+        to this function instead. Required.
+    :type queries: list of strings or dicts
 
-    if rect_max_y:
-        params['boundary.rect.max_lat'] = convert._format_float(rect_max_y)  #
+    :param concurrency: Maximum number of simultaneous requests. Default 8.
+    :type concurrency: integer
 
-    if circle_point:
-        params['boundary.circle.lon'] = convert._format_float(circle_point[0])  #
-        params['boundary.circle.lat'] = convert._format_float(circle_point[1])  #
+    :param dry_run: Print URL and parameters without sending the request.
+    :param dry_run: boolean
 
-    if circle_radius:
-        params['boundary.circle.radius'] = circle_radius
+    :param cache: Response cache consulted before sending the request, e.g. a
+        :class:`openrouteservice.cache.ResponseCache`. Default None.
+    :type cache: object with get(key) and set(key, value) methods
 
-    if sources:
-        params['sources'] = convert._comma_list(sources)
+    :param hits_only: Return a list of :class:`GeocodeHit` instead of the full
+        GeoJSON response. Default False.
+    :type hits_only: boolean
 
-    if layers:
-        params['layers'] = convert._comma_list(layers)
+    :raises ValueError: When parameter has invalid value(s).
+    :raises TypeError: When parameter is of the wrong type.
 
-    if country:
-        params['boundary.country'] = country
+    :rtype: list of dicts from JSON responses or lists of GeocodeHit, in order
+        of queries
+    """
 
-    if size:
-        params['size'] = size
+    params_list = []
+    for query in queries:
+        if isinstance(query, dict):
+            _check_search_arguments(query, _search_arguments)
+            params_list.append(_build_search_params(**query))
+        else:
+            params_list.append(_build_search_params(query))
+
+    pool = ThreadPool(concurrency)
+    try:
+        # One query per task, so no thread works through a chunk of them in
+        # series. Unlike map, imap raises as soon as it reaches a failed query.
+        return list(pool.imap(lambda params: _request(client, _SEARCH_URL, params, dry_run, cache, hits_only),
+                              params_list, chunksize=1))
+    finally:
+        # Drops the outstanding requests if one of them failed
+        pool.terminate()
+        pool.join()
+
+
+def make_pelias_search(client, **fixed):
+    """
+    Creates a search function with some :meth:`pelias_search` arguments fixed,
+    for batch geocoding where e.g. sources, layers, country and size are the
+    same for every query.
+
+    The fixed arguments are validated and converted once, the returned
+    function only processes the arguments passed per call.
 
-    return client.request("/geocode/search", params, dry_run=dry_run)
+    Unlike the other geocoding functions, it is not available as a ``Client``
+    method: it doesn't perform a request itself, but returns a function which
+    does, so there is nothing for the client's per-request ``extra_params`` to
+    apply to.
+
+    For example:
+
+    search = make_pelias_search(client, country='DE', layers=['address'], size=1)
+    results = [search(address) for address in addresses]
+
+    :param fixed: :meth:`pelias_search` query parameters except text, and
+        validate. validate also applies to the arguments passed per call.
+    :type fixed: dict
+
+    :raises ValueError: When parameter has invalid value(s).
+    :raises TypeError: When parameter is of the wrong type.
+
+    :rtype: function(text, dry_run=None, cache=None, hits_only=False, **kwargs)
+        returning the dict from JSON response or list of GeocodeHit, where
+        kwargs are further query parameters
+    """
+
+    _check_search_arguments(fixed, _search_arguments - {'text'})
+    validate = fixed.get('validate', True)
+    fixed_params = _build_search_params(None, **fixed)
+
+    def search(text, dry_run=None, cache=None, hits_only=False, **kwargs):
+        _check_search_arguments(kwargs, _search_arguments - {'text', 'validate'})
+        params = fixed_params.copy()
+        params.update(_build_search_params(text, validate=validate, **kwargs))
+        return _request(client, _SEARCH_URL, params, dry_run, cache, hits_only)
+
+    return search
+
+
+def _check_search_arguments(arguments, allowed):
+    """Raises a TypeError naming the arguments which are not allowed.
+
+    :param arguments: Names of the passed arguments.
+    :type arguments: iterable of strings
+
+    :param allowed: Names of the supported arguments.
+    :type allowed: frozenset
+
+    :raises TypeError: When an argument is not allowed.
+    """
+    unsupported = sorted(set(arguments) - allowed)
+    if unsupported:
+        raise TypeError("Unsupported search argument(s) {}, expected any of {}".format(
+            unsupported, sorted(allowed)))
+
+
+def _build_search_params(text,
+                         focus_point=None,
+                         rect_min_x=None,
+                         rect_min_y=None,
+                         rect_max_x=None,
+                         rect_max_y=None,
+                         circle_point=None,
+                         circle_radius=None,
+                         sources=None,
+                         layers=None,
+                         country=None,
+                         size=None,
+                         validate=True):
+    """Builds the parameters of a search request, see :meth:`pelias_search`."""
+
+    # Built in one pass, unset parameters are dropped
+    params = {key: value for key, value in (
+        ('text', text),
+        ('focus.point.lon', _format_float(focus_point[0]) if focus_point is not None else None),
+        ('focus.point.lat', _format_float(focus_point[1]) if focus_point is not None else None),
+        ('boundary.rect.min_lon', _format_float(rect_min_x) if rect_min_x is not None else None),
+        ('boundary.rect.min_lat', _format_float(rect_min_y) if rect_min_y is not None else None),
+        ('boundary.rect.max_lon', _format_float(rect_max_x) if rect_max_x is not None else None),
+        ('boundary.rect.max_lat', _format_float(rect_max_y) if rect_max_y is not None else None),
+        ('boundary.circle.lon', _format_float(circle_point[0]) if circle_point is not None else None),
+        ('boundary.circle.lat', _format_float(circle_point[1]) if circle_point is not None else None),
+        ('boundary.circle.radius', circle_radius),
+    ) if value is not None}
+
+    _apply_common_filters(params, sources, layers, country, size, validate)
+
+    return params
 
 
 def pelias_autocomplete(client, text,
@@ -184,6 +400,10 @@ def pelias_autocomplete(client, text,
         for details.
     :type layers: list of strings
     
+    :param validate: Specifies whether sources, layers and country should be
+        validated before sending the request. Default True.
+    :type validate: boolean
+
     :param dry_run: Print URL and parameters without sending the request.
     :param dry_run: boolean
 
@@ -195,32 +415,25 @@ def pelias_autocomplete(client, text,
 
     params = {'text': text}
 
-    if focus_point:
-        params['focus.point.lon'] = convert._format_float(focus_point[0])
-        params['focus.point.lat'] = convert._format_float(focus_point[1])
-
-    if rect_min_x:
-        params['boundary.rect.min_lon	'] = convert._format_float(rect_min_x)
+    if focus_point is not None:
+        params['focus.point.lon'] = _format_float(focus_point[0])
+        params['focus.point.lat'] = _format_float(focus_point[1])
 
-    if rect_min_y:
-        params['boundary.rect.min_lat	'] = convert._format_float(rect_min_y)
+    if rect_min_x is not None:
+        params['boundary.rect.min_lon'] = _format_float(rect_min_x)
 
-    if rect_max_x:
-        params['boundary.rect.max_lon	'] = convert._format_float(rect_max_x)
+    if rect_min_y is not None:
+        params['boundary.rect.min_lat'] = _format_float(rect_min_y)
 
-    if rect_max_y:
-        params['boundary.rect.max_lon	'] = convert._format_float(rect_max_y)
+    if rect_max_x is not None:
+        params['boundary.rect.max_lon'] = _format_float(rect_max_x)
 
-    if country:
-        params['boundary.country'] = country
+    if rect_max_y is not None:
+        params['boundary.rect.max_lat'] = _format_float(rect_max_y)
 
-    if sources:
-        params['sources'] = convert._comma_list(sources)
-
-    if layers:
-        params['layers'] = convert._comma_list(layers)
+    _apply_common_filters(params, sources, layers, country, validate=validate)
 
-    return client.request("/geocode/autocomplete", params, dry_run=dry_run)
+    return client.request(_AUTOCOMPLETE_URL, params, dry_run=dry_run)
 
 
 def pelias_structured(client,
@@ -234,6 +447,8 @@ def pelias_structured(client,
                       country=None,
                       validate=True,
                       dry_run=None,
+                      cache=None,
+                      hits_only=False,
                       # size=None
                       ):
     """
@@ -276,41 +491,43 @@ def pelias_structured(client,
     :param country: Highest-level divisions supported in a search. Can be a full name or abbreviation.
     :type country: string
     
+    :param validate: Specifies whether the parameter types should be checked
+        before sending the request. Default True.
+    :type validate: boolean
+
     :param dry_run: Print URL and parameters without sending the request.
     :param dry_run: boolean
 
+    :param cache: Response cache consulted before sending the request, e.g. a
+        :class:`openrouteservice.cache.ResponseCache`. Default None.
+    :type cache: object with get(key) and set(key, value) methods
+
+    :param hits_only: Return a list of :class:`GeocodeHit` instead of the full
+        GeoJSON response. Default False.
+    :type hits_only: boolean
+
     :raises TypeError: When parameter is of the wrong type.
 
-    :rtype: dict from JSON response
+    :rtype: dict from JSON response or list of GeocodeHit
     """
 
     params = dict()
 
-    if address:
-        params['address'] = address
-
-    if neighbourhood:
-        params['neighbourhood'] = neighbourhood
-
-    if borough:
-        params['borough'] = borough
+    for name, value in (('address', address),
+                        ('neighbourhood', neighbourhood),
+                        ('borough', borough),
+                        ('locality', locality),
+                        ('county', county),
+                        ('region', region),
+                        ('postalcode', postalcode),
+                        ('country', country)):
+        if value is None:
+            continue
+        if validate and not isinstance(value, _postalcode_types if name == 'postalcode' else _string_types):
+            raise TypeError(_structured_type_errors[name])
+        params[name] = value
 
-    if locality:
-        params['locality'] = locality
-
-    if county:
-        params['county'] = county
-
-    if region:
-        params['region'] = region
-
-    if postalcode:
-        params['postalcode'] = postalcode
-
-    if country:
-        params['country'] = country
-
-    return client.request("/geocode/search/structured", params, dry_run=dry_run)
+    return _request(client, _STRUCTURED_URL, params, dry_run, cache, hits_only)
 
 
 def pelias_reverse(client, point,
@@ -320,7 +537,9 @@ def pelias_reverse(client, point,
                    country=None,
                    size=None,
                    validate=True,
-                   dry_run=None):
+                   dry_run=None,
+                   cache=None,
+                   hits_only=False):
     """
     Reverse geocoding is the process of converting geographic coordinates into a
     human-readable address.
@@ -350,32 +569,149 @@ def pelias_reverse(client, point,
     :param size: The amount of results returned. Default 10.
     :type size: integer
     
+    :param validate: Specifies whether sources, layers and country should be
+        validated before sending the request. Default True.
+    :type validate: boolean
+
     :param dry_run: Print URL and parameters without sending the request.
     :param dry_run: boolean
 
+    :param cache: Response cache consulted before sending the request, e.g. a
+        :class:`openrouteservice.cache.ResponseCache`. Default None.
+    :type cache: object with get(key) and set(key, value) methods
+
+    :param hits_only: Return a list of :class:`GeocodeHit` instead of the full
+        GeoJSON response. Default False.
+    :type hits_only: boolean
+
     :raises ValueError: When parameter has invalid value(s).
 
-    :rtype: dict from JSON response
+    :rtype: dict from JSON response or list of GeocodeHit
     """
 
     params = dict()
 
-    params['point.lon'] = convert._format_float(point[0])
-    params['point.lat'] = convert._format_float(point[1])
+    params['point.lon'] = _format_float(point[0])
+    params['point.lat'] = _format_float(point[1])
 
-    if circle_radius:
+    if circle_radius is not None:
         params['boundary.circle.radius'] = str(circle_radius)
 
+    _apply_common_filters(params, sources, layers, country, size, validate)
+
+    return _request(client, _REVERSE_URL, params, dry_run, cache, hits_only)
+
+
+def _request(client, url, params, dry_run, cache, hits_only=False):
+    """Performs the request, returning a cached response if available."""
+
+    if cache is None or dry_run:
+        result = client.request(url, params, dry_run=dry_run)
+    else:
+        full_url = client.base_url + url
+        result = _cache_get(cache, full_url, params)
+        if result is None:
+            result = client.request(url, params, dry_run=dry_run)
+            _cache_set(cache, full_url, params, result)
+
+    if hits_only and result is not None:
+        return _to_hits(result)
+
+    return result
+
+
+def _to_hits(response):
+    """Projects the features of a Pelias GeoJSON response to GeocodeHit's."""
+
+    hits = []
+    for feature in response.get('features', []):
+        geometry = feature.get('geometry') or {}
+        lon, lat = (geometry.get('coordinates') or (None, None))[:2]
+        properties = feature.get('properties', {})
+        hits.append(GeocodeHit(lon, lat, properties.get('label'), properties.get('confidence')))
+
+    return hits
+
+
+def _apply_common_filters(params, sources, layers, country, size=None, validate=True):
+    """Adds the sources, layers, country and size filters shared by search,
+    autocomplete and reverse requests to params. Only validates them if
+    validate is True."""
+
     if sources:
-        params['sources'] = convert._comma_list(sources)
+        if validate:
+            params['sources'] = _validated_comma_list(sources, valid_sources, 'Source')
+        else:
+            params['sources'] = _comma_list(sources)
 
     if layers:
-        params['layers'] = convert._comma_list(layers)
+        if validate:
+            params['layers'] = _validated_comma_list(layers, valid_layers, 'Layer')
+        else:
+            params['layers'] = _comma_list(layers)
 
-    if country:
-        params['boundary.country'] = country
+    if country is not None:
+        params['boundary.country'] = _validated_country(country) if validate else country
 
-    if size:
+    if size is not None:
         params['size'] = size
 
-    return client.request("/geocode/reverse", params, dry_run=dry_run)
+
+def _validated_country(country):
+    """Checks that country is an alpha-2 or alpha-3 ISO-3166 country code,
+    saving the round trip for a query which can't return any results, and
+    normalizes it to upper case.
+
+    :param country: The country code, case-insensitive.
+    :type country: string
+
+    :raises ValueError: When country is not an ISO-3166 country code.
+
+    :rtype: string
+    """
+    if not isinstance(country, _string_types) or country.upper() not in valid_countries:
+        raise ValueError("Country must be an alpha-2 or alpha-3 ISO-3166 country code, got {}".format(country))
+    return country.upper()
+
+
+def _validated_comma_list(arg, valid, name):
+    """Checks that all items of arg are in valid and converts them to a
+    comma-separated string.
+
+    :param arg: The list of values, e.g. sources.
+    :type arg: list, tuple or other iterable
+
+    :param valid: All valid values.
+    :type valid: frozenset
+
+    :param name: Name of the parameter used in error messages.
+    :type name: string
+
+    :raises ValueError: When arg contains invalid values.
+    :raises TypeError: When arg is not list-like.
+
+    :rtype: string
+    """
+    # Fast path for the common case, other iterables like sets pass _is_list
+    if not isinstance(arg, (list, tuple)) and not convert._is_list(arg):
+        raise TypeError(
+            "Expected a list or tuple, "
+            "but got {}".format(type(arg).__name__))
+    try:
+        return _join_valid(tuple(arg), valid, name)
+    except TypeError:
+        pass
+
+    # Unhashable items, e.g. nested lists, can't be cached nor be valid values
+    raise ValueError("{} must be one or more of {}, got {}".format(
+        name, sorted(valid), [value for value in arg if not isinstance(value, _string_types) or value not in valid]))
+
+
+@lru_cache(maxsize=64)
+def _join_valid(values, valid, name):
+    """Cached part of _validated_comma_list, batch requests tend to repeat
+    the same sources and layers."""
+    if not valid.issuperset(values):
+        raise ValueError("{} must be one or more of {}, got {}".format(
+            name, sorted(valid), sorted(set(values) - valid)))
+    return _comma_list(values)
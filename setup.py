@@ -44,6 +44,7 @@ setup(
     author_email='nils.nolde@gmail.com',
     license='Apache-2.0',
     packages=['openrouteservice'],
+    package_data={'openrouteservice': ['iso3166.json']},
     install_requires=[
         'requests>=2.0'],
     include_package_data=True,
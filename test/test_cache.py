@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2018 HeiGIT, University of Heidelberg.
+#
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy of
+# the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations under
+# the License.
+#
+
+"""Tests for the cache module."""
+
+import shutil
+import tempfile
+import unittest
+
+try:
+    import diskcache
+except ImportError:
+    diskcache = None
+
+from openrouteservice import cache
+
+
+class CacheTest(unittest.TestCase):
+
+    def test_cache_key(self):
+        key = cache._cache_key('/geocode/search', {'text': 'Heidelberg', 'size': 1})
+        self.assertEqual(key, cache._cache_key('/geocode/search', {'size': 1, 'text': 'Heidelberg'}))
+        self.assertNotEqual(key, cache._cache_key('/geocode/reverse', {'size': 1, 'text': 'Heidelberg'}))
+
+    def test_lru_eviction(self):
+        response_cache = cache.ResponseCache(maxsize=2)
+        response_cache.set('a', 1)
+        response_cache.set('b', 2)
+        response_cache.get('a')
+        response_cache.set('c', 3)
+
+        self.assertEqual(1, response_cache.get('a'))
+        self.assertIsNone(response_cache.get('b'))
+        self.assertEqual(3, response_cache.get('c'))
+
+    def test_expire(self):
+        response_cache = cache.ResponseCache(expire=-1)
+        response_cache.set('a', 1)
+
+        self.assertIsNone(response_cache.get('a'))
+
+    @unittest.skipIf(diskcache is None, "requires diskcache")
+    def test_disk_tier(self):
+        directory = tempfile.mkdtemp()
+        try:
+            cache.ResponseCache(directory=directory).set('a', {'features': []})
+
+            # A new instance starts with an empty memory tier
+            response_cache = cache.ResponseCache(directory=directory)
+            self.assertEqual({'features': []}, response_cache.get('a'))
+            self.assertIn('a', response_cache._memory)
+            self.assertIsNone(response_cache.get('b'))
+        finally:
+            shutil.rmtree(directory)
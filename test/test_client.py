@@ -128,3 +128,9 @@ class ClientTest(_test.TestCase):
         resp = self.client.directions(**query)
 
         self.assertDictContainsSubset({'Authorization': self.key}, responses.calls[0].request.headers)
+
+    def test_connection_pool(self):
+        # Test that the session pools connections for ORS and local instances
+        for base_url in ('https://api.openrouteservice.org', 'http://localhost/ors'):
+            adapter = self.client._session.get_adapter(base_url)
+            self.assertEqual(openrouteservice.client._POOL_MAXSIZE, adapter._pool_maxsize)
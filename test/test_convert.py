@@ -108,6 +108,13 @@ class ConvertTest(unittest.TestCase):
         with self.assertRaises(TypeError):
             convert._pipe_list(5)
 
+    def test_format_float(self):
+        self.assertEqual("40", convert._format_float(40))
+        self.assertEqual("40.1", convert._format_float(40.1))
+        self.assertEqual("40.001", convert._format_float(40.0010))
+        self.assertEqual("0.00001", convert._format_float(0.00001))
+        self.assertEqual("8.123457", convert._format_float(8.1234567))
+
     def test_comma_list_bad_argument(self):
         with self.assertRaises(TypeError):
             convert._comma_list(5)
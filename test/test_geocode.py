@@ -20,9 +20,19 @@
 """Tests for the Pelias geocoding module."""
 
 import responses
+import time
 
+try:  # Python 3
+    from urllib.parse import urlparse, parse_qs
+except ImportError:  # Python 2
+    from urlparse import urlparse, parse_qs
+
+import openrouteservice
 import test as _test
-from test.test_helper import ENDPOINT_DICT
+from openrouteservice.cache import ResponseCache
+from openrouteservice import geocode
+from openrouteservice.geocode import GeocodeHit, make_pelias_search
+from test.test_helper import ENDPOINT_DICT, PARAM_POINT
 
 
 class GeocodingPeliasTest(_test.TestCase):
@@ -43,7 +53,7 @@ class GeocodingPeliasTest(_test.TestCase):
 
         self.assertEqual(1, len(responses.calls))
         self.assertURLEqual(
-            'https://api.openrouteservice.org/geocode/search?boundary.circle.lat=48.23424&boundary.circle.lon=8.34234&boundary.circle.radius=50&boundary.country=de&boundary.rect.max_lat=501&boundary.rect.max_lon=501&boundary.rect.min_lat=500&boundary.rect.min_lon=500&focus.point.lat=48.23424&focus.point.lon=8.34234&layers=locality%2Ccounty%2Cregion&size=50&sources=osm%2Cwof%2Cgn&text=Heidelberg',
+            'https://api.openrouteservice.org/geocode/search?boundary.circle.lat=48.23424&boundary.circle.lon=8.34234&boundary.circle.radius=50&boundary.country=DE&boundary.rect.max_lat=501&boundary.rect.max_lon=501&boundary.rect.min_lat=500&boundary.rect.min_lon=500&focus.point.lat=48.23424&focus.point.lon=8.34234&layers=locality%2Ccounty%2Cregion&size=50&sources=osm%2Cwof%2Cgn&text=Heidelberg',
             responses.calls[0].request.url)
 
     @responses.activate
@@ -58,7 +68,7 @@ class GeocodingPeliasTest(_test.TestCase):
 
         self.assertEqual(1, len(responses.calls))
         self.assertURLEqual(
-            'https://api.openrouteservice.org/geocode/autocomplete?boundary.country=de&boundary.rect.max_lon%09=500&boundary.rect.min_lat%09=500&boundary.rect.min_lon%09=500&focus.point.lat=48.23424&focus.point.lon=8.34234&layers=locality%2Ccounty%2Cregion&sources=osm%2Cwof%2Cgn&text=Heidelberg',
+            'https://api.openrouteservice.org/geocode/autocomplete?boundary.country=DE&boundary.rect.max_lat=500&boundary.rect.max_lon=500&boundary.rect.min_lat=500&boundary.rect.min_lon=500&focus.point.lat=48.23424&focus.point.lon=8.34234&layers=locality%2Ccounty%2Cregion&sources=osm%2Cwof%2Cgn&text=Heidelberg',
             responses.calls[0].request.url)
 
     @responses.activate
@@ -88,5 +98,203 @@ class GeocodingPeliasTest(_test.TestCase):
 
         self.assertEqual(1, len(responses.calls))
         self.assertURLEqual(
-            'https://api.openrouteservice.org/geocode/reverse?boundary.circle.radius=50&boundary.country=de&layers=locality%2Ccounty%2Cregion&point.lat=48.23424&point.lon=8.34234&size=50&sources=osm%2Cwof%2Cgn',
+            'https://api.openrouteservice.org/geocode/reverse?boundary.circle.radius=50&boundary.country=DE&layers=locality%2Ccounty%2Cregion&point.lat=48.23424&point.lon=8.34234&size=50&sources=osm%2Cwof%2Cgn',
+            responses.calls[0].request.url)
+
+    @responses.activate
+    def test_pelias_search_cache(self):
+        responses.add(responses.GET,
+                      'https://api.openrouteservice.org/geocode/search',
+                      body='{"status":"OK","results":[]}',
+                      status=200,
+                      content_type='application/json')
+
+        cache = ResponseCache()
+        first = self.client.pelias_search(cache=cache, **self.search)
+        second = self.client.pelias_search(cache=cache, **self.search)
+
+        self.assertEqual(1, len(responses.calls))
+        self.assertEqual(first, second)
+
+    @responses.activate
+    def test_pelias_search_cache_mutation(self):
+        responses.add(responses.GET,
+                      'https://api.openrouteservice.org/geocode/search',
+                      body='{"type":"FeatureCollection","features":[]}',
+                      status=200,
+                      content_type='application/json')
+
+        cache = ResponseCache()
+        first = self.client.pelias_search(text='Heidelberg', cache=cache)
+        first['features'].append(1)
+        second = self.client.pelias_search(text='Heidelberg', cache=cache)
+        second['features'].append(2)
+        third = self.client.pelias_search(text='Heidelberg', cache=cache)
+
+        self.assertEqual(1, len(responses.calls))
+        self.assertEqual([], third['features'])
+
+    @responses.activate
+    def test_pelias_search_bulk(self):
+        responses.add(responses.GET,
+                      'https://api.openrouteservice.org/geocode/search',
+                      body='{"status":"OK","results":[]}',
+                      status=200,
+                      content_type='application/json')
+
+        queries = ['Heidelberg', {'text': 'Berlin', 'size': 1}, 'Mannheim']
+        results = self.client.pelias_search_bulk(queries, concurrency=2)
+
+        self.assertEqual(3, len(results))
+        self.assertEqual(3, len(responses.calls))
+        self.assertEqual(['Berlin', 'Heidelberg', 'Mannheim'],
+                         sorted(parse_qs(urlparse(call.request.url).query)['text'][0]
+                                for call in responses.calls))
+
+    def test_pelias_invalid_sources_layers(self):
+        with self.assertRaises(ValueError):
+            self.client.pelias_search(text='Heidelberg', sources=['osm', 'google'])
+
+        with self.assertRaises(ValueError):
+            self.client.pelias_reverse(point=[8.34234, 48.23424], layers=['locality', 'planet'])
+
+        with self.assertRaises(ValueError):
+            self.client.pelias_search(text='Heidelberg', sources=['osm', ['x']])
+
+        with self.assertRaises(TypeError):
+            self.client.pelias_search(text='Heidelberg', sources='osm')
+
+    def test_pelias_validate(self):
+        params = geocode._build_search_params('Heidelberg', sources=['openstreetmap', 'wof'])
+        self.assertEqual('openstreetmap,wof', params['sources'])
+
+        params = geocode._build_search_params('Pristina', sources=['google'], layers=['planet'], country='XK',
+                                              validate=False)
+        self.assertEqual('google', params['sources'])
+        self.assertEqual('planet', params['layers'])
+        self.assertEqual('XK', params['boundary.country'])
+
+        with self.assertRaises(ValueError):
+            geocode._build_search_params('Pristina', country='XK')
+
+    def test_pelias_iterable_sources_layers(self):
+        params = geocode._build_search_params('Heidelberg', sources={'osm'},
+                                              layers=(layer for layer in ['locality', 'county']))
+
+        self.assertEqual('osm', params['sources'])
+        self.assertEqual('locality,county', params['layers'])
+
+    def test_pelias_structured_invalid_type(self):
+        with self.assertRaises(TypeError):
+            self.client.pelias_structured(locality=['Heidelberg'])
+
+        self.client.pelias_structured(locality=['Heidelberg'], validate=False, dry_run='true')
+
+    def test_pelias_invalid_country(self):
+        with self.assertRaises(ValueError):
+            self.client.pelias_search(text='Heidelberg', country='XY')
+
+        with self.assertRaises(ValueError):
+            self.client.pelias_reverse(point=[8.34234, 48.23424], country='Germany')
+
+    @responses.activate
+    def test_make_pelias_search(self):
+        responses.add(responses.GET,
+                      'https://api.openrouteservice.org/geocode/search',
+                      body='{"status":"OK","results":[]}',
+                      status=200,
+                      content_type='application/json')
+
+        search = make_pelias_search(self.client, country='de', layers=['locality'], size=1)
+        search('Heidelberg', focus_point=[8.34234, 48.23424])
+
+        self.assertEqual(1, len(responses.calls))
+        self.assertURLEqual(
+            'https://api.openrouteservice.org/geocode/search?boundary.country=DE&focus.point.lat=48.23424&focus.point.lon=8.34234&layers=locality&size=1&text=Heidelberg',
             responses.calls[0].request.url)
+
+        with self.assertRaises(ValueError):
+            make_pelias_search(self.client, country='XY')
+
+        with self.assertRaises(TypeError):
+            make_pelias_search(self.client, cache=None)
+
+        with self.assertRaises(TypeError):
+            search('Heidelberg', validate=False)
+
+        search = make_pelias_search(self.client, country='XK', validate=False)
+        search('Pristina', sources=['google'])
+
+        self.assertURLEqual(
+            'https://api.openrouteservice.org/geocode/search?boundary.country=XK&sources=google&text=Pristina',
+            responses.calls[1].request.url)
+
+    @responses.activate
+    def test_pelias_search_zero_values(self):
+        responses.add(responses.GET,
+                      'https://api.openrouteservice.org/geocode/search',
+                      body='{"status":"OK","results":[]}',
+                      status=200,
+                      content_type='application/json')
+
+        self.client.pelias_search(text='Null Island', rect_min_x=0, rect_min_y=0.0, rect_max_x=1, rect_max_y=1,
+                                  size=0)
+
+        self.assertURLEqual(
+            'https://api.openrouteservice.org/geocode/search?boundary.rect.max_lat=1&boundary.rect.max_lon=1&boundary.rect.min_lat=0&boundary.rect.min_lon=0&size=0&text=Null+Island',
+            responses.calls[0].request.url)
+
+    @responses.activate
+    def test_pelias_reverse_hits_only(self):
+        responses.add(responses.GET,
+                      'https://api.openrouteservice.org/geocode/reverse',
+                      json={'type': 'FeatureCollection',
+                            'features': [{'type': 'Feature',
+                                          'geometry': {'type': 'Point', 'coordinates': [8.34234, 48.23424]},
+                                          'properties': {'label': 'Heidelberg, Germany', 'confidence': 0.8}}]},
+                      status=200,
+                      content_type='application/json')
+
+        hits = self.client.pelias_reverse(point=PARAM_POINT, hits_only=True)
+
+        self.assertEqual([GeocodeHit(8.34234, 48.23424, 'Heidelberg, Germany', 0.8)], hits)
+
+    def test_pelias_hits_without_geometry(self):
+        hits = geocode._to_hits({'type': 'FeatureCollection',
+                                 'features': [{'type': 'Feature', 'geometry': None,
+                                               'properties': {'label': 'Heidelberg, Germany'}}]})
+
+        self.assertEqual([GeocodeHit(None, None, 'Heidelberg, Germany', None)], hits)
+
+    @responses.activate
+    def test_pelias_search_bulk_error(self):
+        def bad_request(request):
+            # Slow enough for the pool to be terminated before all requests are sent
+            time.sleep(0.05)
+            return 400, {}, '{"error": "Bad request"}'
+
+        responses.add_callback(responses.GET,
+                               'https://api.openrouteservice.org/geocode/search',
+                               callback=bad_request,
+                               content_type='application/json')
+
+        with self.assertRaises(openrouteservice.exceptions.ApiError):
+            self.client.pelias_search_bulk(['Heidelberg'] * 20, concurrency=1)
+
+        self.assertLess(len(responses.calls), 20)
+
+    def test_pelias_search_bulk_invalid_argument(self):
+        with self.assertRaises(TypeError) as cm:
+            self.client.pelias_search_bulk([{'text': 'Heidelberg', 'cache': None}])
+
+        self.assertIn("'cache'", str(cm.exception))
+        self.assertNotIn('_build_search_params', str(cm.exception))
+
+        self.client.pelias_search_bulk([{'text': 'Heidelberg', 'sources': ['google'], 'validate': False}],
+                                       dry_run='true')
+
+    def test_pelias_country_codes(self):
+        self.assertIn('DE', geocode.valid_countries)
+        self.assertIn('DEU', geocode.valid_countries)
+        self.assertFalse(hasattr(geocode, 'f'))
+        self.assertFalse(hasattr(geocode, '_iso3166'))